@@ -2,89 +2,289 @@
 """Parse Claude session history to extract file edits."""
 
 import json
+import mmap
+import os
+import re
 import sys
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional, Sequence, Union
+
+try:
+    import orjson
+    _loads = orjson.loads
+    _JSONDecodeError = orjson.JSONDecodeError
+except ImportError:
+    _loads = json.loads
+    _JSONDecodeError = json.JSONDecodeError
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+if msgspec is not None:
+    # Typed views of just the fields we read. msgspec skips everything else
+    # in the entry without materializing it, and a shape mismatch (e.g. a
+    # Read or Bash toolUseResult) fails validation instead of matching.
+    class _EditResult(msgspec.Struct):
+        filePath: str
+        newString: str
+        oldString: str = ""
+
+    class _EditEntry(msgspec.Struct):
+        toolUseResult: Optional[_EditResult] = None
+
+    class _WriteInput(msgspec.Struct):
+        file_path: str = ""
+        content: str = ""
+
+    class _Block(msgspec.Struct):
+        type: str = ""
+        name: str = ""
+        input: msgspec.Raw = msgspec.Raw(b"{}")
+
+    class _Message(msgspec.Struct):
+        role: str = ""
+        content: Union[str, list[_Block]] = []
+
+    class _WriteEntry(msgspec.Struct):
+        message: Optional[_Message] = None
+
+    _edit_decoder = msgspec.json.Decoder(_EditEntry)
+    _write_decoder = msgspec.json.Decoder(_WriteEntry)
+    _write_input_decoder = msgspec.json.Decoder(_WriteInput)
 
 HISTORY_DIR = Path.home() / ".claude/projects/-Users-eriklangille-Projects-clauntty"
 
 
-def find_edits(session_file: Path, file_filter: Optional[str] = None, content_filter: Optional[str] = None):
-    """Find all Edit tool uses in a session file."""
+def _needle(text: str) -> bytes:
+    """Encode a filter string the way it appears inside a raw JSON line."""
+    return json.dumps(text, ensure_ascii=False)[1:-1].encode()
+
+
+def _patterns(content_filter: Union[str, Sequence[str], None]) -> list[str]:
+    """Normalize a content filter to a list of non-empty patterns."""
+    if isinstance(content_filter, str):
+        content_filter = [content_filter]
+    return [p for p in content_filter or [] if p]
+
+
+def _prefilter(
+    sentinel: bytes, file_filter: Optional[str], patterns: list[str]
+) -> tuple[list[bytes], Optional[re.Pattern]]:
+    """Byte filters a line must pass to be worth parsing.
+
+    Returns needles the line must all contain, plus (for several content
+    patterns) one compiled alternation that finds any of them in a single
+    scan instead of one find() per pattern.
+    """
+    needles = [sentinel]
+    if file_filter:
+        needles.append(_needle(file_filter))
+    any_of = None
+    if len(patterns) == 1:
+        needles.append(_needle(patterns[0]))
+    elif patterns:
+        any_of = re.compile(b"|".join(re.escape(_needle(p)) for p in patterns))
+    return needles, any_of
+
+
+def _content_matcher(patterns: list[str]) -> Callable[[str], bool]:
+    """Return a predicate that is true when text contains any pattern.
+
+    Several patterns are compiled into one Aho-Corasick automaton (when
+    pyahocorasick is installed) so each text is scanned once regardless of
+    how many patterns there are.
+    """
+    if not patterns:
+        return lambda text: True
+    if len(patterns) == 1 or ahocorasick is None:
+        return lambda text: any(p in text for p in patterns)
+
+    automaton = ahocorasick.Automaton()
+    for p in patterns:
+        automaton.add_word(p, p)
+    automaton.make_automaton()
+    return lambda text: next(automaton.iter(text), None) is not None
+
+
+def _candidate_lines(session_file: Path, needles: list[bytes], any_of: Optional[re.Pattern] = None):
+    """Yield (line_num, line) for lines containing every needle (and any_of).
+
+    The file is mapped rather than read, and lines are only copied out of
+    the mapping once they pass the byte-level filters.
+    """
+    fd = os.open(session_file, os.O_RDONLY)
+    try:
+        if os.fstat(fd).st_size == 0:
+            return
+        with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+            size = len(mm)
+            pos = 0
+            line_num = 0
+            while pos < size:
+                end = mm.find(b"\n", pos)
+                if end < 0:
+                    end = size
+                line_num += 1
+                if all(mm.find(n, pos, end) >= 0 for n in needles) and (
+                    any_of is None or any_of.search(mm, pos, end)
+                ):
+                    yield line_num, mm[pos:end]
+                pos = end + 1
+    finally:
+        os.close(fd)
+
+
+def _edit_result(line: bytes) -> Optional[tuple[str, str, str]]:
+    """(file_path, old_string, new_string) if the line is an Edit result."""
+    if msgspec is not None:
+        try:
+            result = _edit_decoder.decode(line).toolUseResult
+        except msgspec.DecodeError:
+            return None
+        if result is None:
+            return None
+        return result.filePath, result.oldString, result.newString
+
+    try:
+        entry = _loads(line)
+    except _JSONDecodeError:
+        return None
+
+    # Look for tool results that show file edits
+    if "toolUseResult" in entry:
+        result = entry["toolUseResult"]
+        if "filePath" in result and "newString" in result:
+            return result.get("filePath", ""), result.get("oldString", ""), result.get("newString", "")
+    return None
+
+
+def _write_inputs(line: bytes) -> list[tuple[str, str]]:
+    """(file_path, content) for each Write tool use in the line."""
+    if msgspec is not None:
+        try:
+            msg = _write_decoder.decode(line).message
+            if msg is None or msg.role != "assistant" or isinstance(msg.content, str):
+                return []
+            inputs = [
+                _write_input_decoder.decode(block.input)
+                for block in msg.content
+                if block.type == "tool_use" and block.name == "Write"
+            ]
+        except msgspec.DecodeError:
+            return []
+        return [(inp.file_path, inp.content) for inp in inputs]
+
+    try:
+        entry = _loads(line)
+    except _JSONDecodeError:
+        return []
+
+    # Look for Write tool uses in assistant messages
+    writes = []
+    msg = entry.get("message", {})
+    if msg.get("role") == "assistant":
+        content = msg.get("content", [])
+        for block in content:
+            if block.get("type") == "tool_use" and block.get("name") == "Write":
+                inp = block.get("input", {})
+                writes.append((inp.get("file_path", ""), inp.get("content", "")))
+    return writes
+
+
+def find_edits(
+    session_file: Path,
+    file_filter: Optional[str] = None,
+    content_filter: Union[str, Sequence[str], None] = None,
+):
+    """Find all Edit tool uses in a session file.
+
+    content_filter may be a single string or a list; an edit matches if its
+    old or new text contains any of them.
+    """
     edits = []
+    patterns = _patterns(content_filter)
+    matches = _content_matcher(patterns)
+    needles, any_of = _prefilter(b'"toolUseResult"', file_filter, patterns)
 
-    with open(session_file) as f:
-        for line_num, line in enumerate(f, 1):
-            try:
-                entry = json.loads(line)
-            except json.JSONDecodeError:
-                continue
+    # Cheap byte scan first; most lines can't match and never get parsed
+    for line_num, line in _candidate_lines(session_file, needles, any_of):
+        edit = _edit_result(line)
+        if edit is None:
+            continue
+        file_path, old_string, new_string = edit
+
+        # Apply filters
+        if file_filter and file_filter not in file_path:
+            continue
+        if patterns and not matches(new_string) and not matches(old_string):
+            continue
 
-            # Look for tool results that show file edits
-            if "toolUseResult" in entry:
-                result = entry["toolUseResult"]
-                if "filePath" in result and "newString" in result:
-                    file_path = result.get("filePath", "")
-                    new_string = result.get("newString", "")
-                    old_string = result.get("oldString", "")
-
-                    # Apply filters
-                    if file_filter and file_filter not in file_path:
-                        continue
-                    if content_filter and content_filter not in new_string and content_filter not in old_string:
-                        continue
-
-                    edits.append({
-                        "line": line_num,
-                        "file": file_path,
-                        "old": old_string,
-                        "new": new_string,
-                    })
+        edits.append({
+            "line": line_num,
+            "file": file_path,
+            "old": old_string,
+            "new": new_string,
+        })
 
     return edits
 
 
-def find_writes(session_file: Path, file_filter: Optional[str] = None, content_filter: Optional[str] = None):
-    """Find all Write tool uses in a session file."""
+def find_writes(
+    session_file: Path,
+    file_filter: Optional[str] = None,
+    content_filter: Union[str, Sequence[str], None] = None,
+):
+    """Find all Write tool uses in a session file.
+
+    content_filter may be a single string or a list; a write matches if its
+    content contains any of them.
+    """
     writes = []
+    patterns = _patterns(content_filter)
+    matches = _content_matcher(patterns)
+    needles, any_of = _prefilter(b'"tool_use"', file_filter, patterns)
 
-    with open(session_file) as f:
-        for line_num, line in enumerate(f, 1):
-            try:
-                entry = json.loads(line)
-            except json.JSONDecodeError:
+    for line_num, line in _candidate_lines(session_file, needles, any_of):
+        for file_path, file_content in _write_inputs(line):
+            if file_filter and file_filter not in file_path:
+                continue
+            if patterns and not matches(file_content):
                 continue
 
-            # Look for Write tool uses in assistant messages
-            msg = entry.get("message", {})
-            if msg.get("role") == "assistant":
-                content = msg.get("content", [])
-                for block in content:
-                    if block.get("type") == "tool_use" and block.get("name") == "Write":
-                        inp = block.get("input", {})
-                        file_path = inp.get("file_path", "")
-                        file_content = inp.get("content", "")
-
-                        if file_filter and file_filter not in file_path:
-                            continue
-                        if content_filter and content_filter not in file_content:
-                            continue
-
-                        writes.append({
-                            "line": line_num,
-                            "file": file_path,
-                            "content": file_content,
-                        })
+            writes.append({
+                "line": line_num,
+                "file": file_path,
+                "content": file_content,
+            })
 
     return writes
 
 
+def _sessions() -> list[os.DirEntry]:
+    """Session files, most recently modified first.
+
+    One scandir pass; DirEntry caches its stat so sorting and size
+    reporting don't hit the filesystem again per file.
+    """
+    try:
+        with os.scandir(HISTORY_DIR) as it:
+            sessions = [e for e in it if e.name.endswith(".jsonl") and e.is_file()]
+    except FileNotFoundError:
+        return []
+    sessions.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+    return sessions
+
+
 def list_sessions():
     """List all session files."""
-    sessions = list(HISTORY_DIR.glob("*.jsonl"))
-    sessions.sort(key=lambda p: p.stat().st_mtime, reverse=True)
-
-    for s in sessions[:20]:
+    for s in _sessions()[:20]:
         size = s.stat().st_size / 1024
         print(f"{s.name}: {size:.1f}KB")
 
@@ -95,7 +295,7 @@ def main():
     parser.add_argument("--list", action="store_true", help="List session files")
     parser.add_argument("--session", "-s", help="Session file name (partial match)")
     parser.add_argument("--file", "-f", help="Filter by file path")
-    parser.add_argument("--content", "-c", help="Filter by content")
+    parser.add_argument("--content", "-c", action="append", help="Filter by content (repeatable, matches any)")
     parser.add_argument("--writes", action="store_true", help="Show Write operations instead of Edits")
     parser.add_argument("--full", action="store_true", help="Show full content")
 
@@ -105,18 +305,17 @@ def main():
         list_sessions()
         return
 
-    # Find session file
+    # Find session file (most recent match)
+    sessions = _sessions()
     if args.session:
-        matches = list(HISTORY_DIR.glob(f"*{args.session}*.jsonl"))
-        if not matches:
+        sessions = [s for s in sessions if args.session in s.name]
+        if not sessions:
             print(f"No session matching '{args.session}'")
             return
-        session_file = matches[0]
-    else:
-        # Use most recent
-        sessions = list(HISTORY_DIR.glob("*.jsonl"))
-        sessions.sort(key=lambda p: p.stat().st_mtime, reverse=True)
-        session_file = sessions[0]
+    elif not sessions:
+        print(f"No sessions in {HISTORY_DIR}")
+        return
+    session_file = Path(sessions[0].path)
 
     print(f"Session: {session_file.name}")
     print()
@@ -1,30 +1,98 @@
 #!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.9"
+# dependencies = ["numpy"]
+# ///
 """
 Compression benchmark for rtach terminal data.
 
 Tests different compression strategies:
 1. Per-frame (stateless) vs streaming (stateful)
-2. Different algorithms (zlib, lzma, zstd if available)
+2. Different algorithms (zlib, lzma; zstd, lz4, brotli if available)
 3. Different frame sizes
 4. Different compression levels
 
-Run: uv run tools/compression_bench.py
+Run: uv run tools/compression_bench.py [--csv] [--jobs N] [--slow]
+
+uv runs the script in its own environment built from the metadata above
+(numpy only), so pip-installed packages are not visible to it. Add the
+optional comparisons with --with:
+
+    uv run --with zstandard --with lz4 --with brotli --with google-crc32c \
+        tools/compression_bench.py
+
+The grid runs serially by default. --jobs N spreads it across worker
+processes for a quick ratio sweep, but cells then compete for CPU and the
+MB/s column is not comparable to a serial run.
+
+With Cython and a C compiler, tools/frame_compress.pyx is built on first
+run and adds zlib_frame*_native rows: the same per-frame loop in C, showing
+how much of the per-frame cost is Python overhead. pyximport needs
+setuptools on Python 3.12+, so pass both:
+
+    uv run --with cython --with setuptools tools/compression_bench.py
 """
 
+import argparse
+import csv
+import functools
+import os
+import sys
 import zlib
 import lzma
 import time
-import random
 import string
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass
+from typing import Callable, Optional
+
+import numpy as np
 
 try:
     import zstandard as zstd
     HAS_ZSTD = True
 except ImportError:
     HAS_ZSTD = False
-    print("Note: zstd not available, skipping zstd tests")
-    print("Install with: pip install zstandard\n")
+
+try:
+    import lz4.block
+    import lz4.frame
+    HAS_LZ4 = True
+except ImportError:
+    HAS_LZ4 = False
+
+try:
+    import brotli
+    HAS_BROTLI = True
+except ImportError:
+    HAS_BROTLI = False
+
+try:
+    import google_crc32c
+    HAS_CRC32C = True
+except ImportError:
+    HAS_CRC32C = False
+
+# Native per-frame driver (tools/frame_compress.pyx), compiled on first use
+# by pyximport; needs Cython, a C compiler and zlib headers.
+try:
+    import pyximport
+    _pyx_hooks = pyximport.install(language_level=3)
+    try:
+        import frame_compress
+    finally:
+        pyximport.uninstall(*_pyx_hooks)
+    HAS_NATIVE_FRAMES = True
+except ImportError:
+    HAS_NATIVE_FRAMES = False
+
+# Frame checksums. zlib.crc32 is zlib's software CRC-32; crc32c uses the
+# CPU's CRC32 instruction (SSE4.2 / ARMv8) when google-crc32c has its C
+# extension. That binding only accepts bytes, so its frame copy is counted.
+CHECKSUMS: dict[str, Callable[[memoryview], int]] = {"crc32": zlib.crc32}
+if HAS_CRC32C:
+    CHECKSUMS["crc32c"] = lambda chunk: google_crc32c.value(chunk.tobytes())
 
 
 @dataclass
@@ -33,215 +101,631 @@ class Result:
     original: int
     compressed: int
     time_ns: int
-
-    @property
-    def ratio(self) -> float:
-        return self.compressed / self.original * 100
-
-    @property
-    def speed_mbps(self) -> float:
-        seconds = self.time_ns / 1e9
-        if seconds == 0:
-            return 0
-        return (self.original / 1024 / 1024) / seconds
-
-
-def generate_terminal_data(size: int) -> bytes:
+    dataset: str = ""
+
+
+RESULT_DTYPE = np.dtype([
+    ("dataset", "U32"),
+    ("name", "U64"),
+    ("size", np.int64),
+    ("compressed", np.int64),
+    ("time_ns", np.int64),
+    ("ratio", np.float64),
+    ("mbps", np.float64),
+])
+
+
+def tabulate(results: list[Result]) -> np.ndarray:
+    """Pack results into a RESULT_DTYPE array with ratio/mbps filled in."""
+    table = np.zeros(len(results), dtype=RESULT_DTYPE)
+    table["dataset"] = [r.dataset for r in results]
+    table["name"] = [r.name for r in results]
+    table["size"] = [r.original for r in results]
+    table["compressed"] = [r.compressed for r in results]
+    table["time_ns"] = [r.time_ns for r in results]
+    table["ratio"] = table["compressed"] / table["size"] * 100
+    table["mbps"] = (table["size"] / 1024 / 1024) / (table["time_ns"] / 1e9)
+    return table
+
+
+def _flat_table(chunks: list[bytes], base: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """Offsets (starting at base) and lengths of chunks laid out back to back."""
+    lens = np.array([len(c) for c in chunks], dtype=np.int64)
+    offsets = base + np.concatenate(([0], np.cumsum(lens)[:-1]))
+    return offsets, lens
+
+
+# Building blocks for generate_terminal_data, encoded once at import
+_ESCAPES = [
+    b"\x1b[0m",      # Reset
+    b"\x1b[1m",      # Bold
+    b"\x1b[32m",     # Green
+    b"\x1b[31m",     # Red
+    b"\x1b[0;32m",   # Reset + Green
+    b"\x1b[1;33m",   # Bold Yellow
+    b"\x1b[38;5;208m", # 256-color
+    b"\x1b[K",       # Clear line
+    b"\x1b[2J",      # Clear screen
+    b"\x1b[H",       # Home cursor
+    b"\x1b[?25h",    # Show cursor
+    b"\x1b[?25l",    # Hide cursor
+]
+
+_PATTERNS = [
+    b"drwxr-xr-x",
+    b"-rw-r--r--",
+    b"total ",
+    b"user@host:",
+    b"$ ",
+    b">>> ",
+    b"... ",
+    b"error: ",
+    b"warning: ",
+    b"  adding: ",
+    b"Compiling ",
+    b"   Linking ",
+]
+
+PRINTABLE = np.frombuffer(string.printable.encode(), dtype=np.uint8)
+
+# Every fixed chunk lives in one source table; random text is appended
+# after it per batch. Each step of the generator is then just a
+# (source offset, length) pair, and the output is one gather.
+_TABLE = np.frombuffer(b"".join(_ESCAPES) + b"".join(_PATTERNS) + b" " * 40 + b"\r\n\x00", dtype=np.uint8)
+_ESC_OFFS, _ESC_LENS = _flat_table(_ESCAPES)
+_PAT_OFFS, _PAT_LENS = _flat_table(_PATTERNS, base=_ESC_LENS.sum())
+_SPACES_OFF = len(_TABLE) - 43
+_CRLF_OFF = len(_TABLE) - 3
+_NULL_OFF = len(_TABLE) - 1
+
+# Each step draws an index into this table; repeats set the mix
+_ESCAPE, _SPACES, _NEWLINE, _PATTERN, _TEXT, _NULL = range(6)
+_CATEGORY = np.array([_ESCAPE] * 3 + [_SPACES] * 2 + [_NEWLINE] + [_PATTERN] * 2 + [_TEXT] * 2 + [_NULL])
+
+
+def generate_terminal_data(size: int, seed: int = 12345) -> bytes:
     """Generate synthetic terminal data with realistic patterns."""
-    data = bytearray()
-
-    escapes = [
-        b"\x1b[0m",      # Reset
-        b"\x1b[1m",      # Bold
-        b"\x1b[32m",     # Green
-        b"\x1b[31m",     # Red
-        b"\x1b[0;32m",   # Reset + Green
-        b"\x1b[1;33m",   # Bold Yellow
-        b"\x1b[38;5;208m", # 256-color
-        b"\x1b[K",       # Clear line
-        b"\x1b[2J",      # Clear screen
-        b"\x1b[H",       # Home cursor
-        b"\x1b[?25h",    # Show cursor
-        b"\x1b[?25l",    # Hide cursor
-    ]
-
-    patterns = [
-        b"drwxr-xr-x",
-        b"-rw-r--r--",
-        b"total ",
-        b"user@host:",
-        b"$ ",
-        b">>> ",
-        b"... ",
-        b"error: ",
-        b"warning: ",
-        b"  adding: ",
-        b"Compiling ",
-        b"   Linking ",
-    ]
-
-    random.seed(12345)
-
-    while len(data) < size:
-        choice = random.randint(0, 10)
-
-        if choice <= 2:  # ANSI escapes
-            data.extend(random.choice(escapes))
-        elif choice <= 4:  # Repeated spaces
-            data.extend(b" " * random.randint(1, 40))
-        elif choice == 5:  # Newlines
-            if random.random() > 0.5:
-                data.append(ord('\r'))
-            data.append(ord('\n'))
-        elif choice <= 7:  # Shell patterns
-            data.extend(random.choice(patterns))
-        elif choice <= 9:  # Random printable ASCII
-            data.extend(random.choices(string.printable.encode(), k=random.randint(10, 80)))
-        else:  # Occasional null
-            data.append(0)
-
-    return bytes(data[:size])
+    rng = np.random.default_rng(seed)
+
+    # Steps average ~15 bytes, so one batch normally covers the whole buffer
+    out = np.empty(size, dtype=np.uint8)
+    filled = 0
+    while filled < size:
+        n = (size - filled) // 8 + 16
+        category = _CATEGORY[rng.integers(0, len(_CATEGORY), size=n)]
+        escape_idx = rng.integers(0, len(_ESCAPES), size=n)
+        space_lens = rng.integers(1, 41, size=n)
+        crlf = rng.random(n) > 0.5
+        pattern_idx = rng.integers(0, len(_PATTERNS), size=n)
+        text_lens = np.where(category == _TEXT, rng.integers(10, 81, size=n), 0)
+        text = PRINTABLE[rng.integers(0, len(PRINTABLE), size=int(text_lens.sum()))]
+        text_offs = len(_TABLE) + np.cumsum(text_lens) - text_lens
+
+        # Row c holds what every step would emit if it were category c;
+        # indexing by category picks each step's chunk without branching
+        cols = np.arange(n)
+        starts = np.stack([
+            _ESC_OFFS[escape_idx],                          # ANSI escapes
+            np.full(n, _SPACES_OFF),                        # Repeated spaces
+            np.where(crlf, _CRLF_OFF, _CRLF_OFF + 1),       # Newlines (\r\n or \n)
+            _PAT_OFFS[pattern_idx],                         # Shell patterns
+            text_offs,                                      # Random printable ASCII
+            np.full(n, _NULL_OFF),                          # Occasional null
+        ])[category, cols]
+        lens = np.stack([
+            _ESC_LENS[escape_idx],
+            space_lens,
+            1 + crlf,
+            _PAT_LENS[pattern_idx],
+            text_lens,
+            np.ones(n, dtype=np.int64),
+        ])[category, cols]
+
+        # Keep only the steps needed to fill the rest of the buffer
+        ends = np.cumsum(lens)
+        steps = min(int(np.searchsorted(ends, size - filled)) + 1, n)
+        starts, lens, ends = starts[:steps], lens[:steps], ends[:steps]
+        take = min(int(ends[-1]), size - filled)
+
+        # Gather: output byte k of step i comes from source[starts[i] + k]
+        source = np.concatenate((_TABLE, text))
+        idx = np.repeat(starts - (ends - lens), lens) + np.arange(ends[-1])
+        out[filled:filled + take] = source[idx[:take]]
+        filled += take
+
+    return out.tobytes()
 
 
 def generate_editor_data(size: int) -> bytes:
     """Generate vim-like cursor positioning output."""
-    data = bytearray()
+    # Preallocated and space-filled, so the tail padding is already in place
+    data = bytearray(b" " * size)
+    pos = 0
     line, col = 1, 1
     content = b"const foo = 123;"
 
-    while len(data) + 20 < size:
+    while pos + 20 < size:
         # Cursor position: ESC[line;colH
-        data.extend(f"\x1b[{line};{col}H".encode())
-        data.extend(content)
+        chunk = f"\x1b[{line};{col}H".encode() + content
+        data[pos:pos + len(chunk)] = chunk
+        pos += len(chunk)
         line = (line % 50) + 1
         col = (col % 80) + 1
 
-    data.extend(b" " * (size - len(data)))
-    return bytes(data[:size])
+    return bytes(memoryview(data)[:size])
+
+
+def bench(fn: Callable[..., int], *args, warmup: int = 1, iters: int = 5) -> tuple[int, int]:
+    """Return fn(*args) and the fastest of `iters` timings in ns.
+
+    Warmup calls absorb one-time costs (allocator, caches) and taking the
+    minimum filters out scheduler noise that single-shot timings at these
+    sizes are dominated by.
+    """
+    for _ in range(warmup):
+        fn(*args)
+    best = None
+    for _ in range(iters):
+        start = time.perf_counter_ns()
+        result = fn(*args)
+        elapsed = time.perf_counter_ns() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
 
 
 def compress_streaming_zlib(data: bytes, level: int = 6) -> tuple[int, int]:
     """Compress entire data with single compressor (streaming/stateful)."""
-    start = time.perf_counter_ns()
-    compressed = zlib.compress(data, level)
-    elapsed = time.perf_counter_ns() - start
-    return len(compressed), elapsed
+    return bench(lambda: len(zlib.compress(data, level)))
 
 
 def compress_per_frame_zlib(data: bytes, frame_size: int, level: int = 6) -> tuple[int, int]:
     """Compress in independent frames (stateless)."""
-    start = time.perf_counter_ns()
-    total = 0
-    offset = 0
+    mv = memoryview(data)  # frame slices are zero-copy views
+
+    def run() -> int:
+        total = 0
+        offset = 0
+        while offset < len(mv):
+            chunk = mv[offset:offset + frame_size]
+            compressed = zlib.compress(chunk, level)
+            total += 4 + len(compressed)  # 4-byte length prefix
+            offset += frame_size
+        return total
+
+    return bench(run)
 
-    while offset < len(data):
-        chunk = data[offset:offset + frame_size]
-        compressed = zlib.compress(chunk, level)
-        total += 4 + len(compressed)  # 4-byte length prefix
-        offset += frame_size
 
-    elapsed = time.perf_counter_ns() - start
-    return total, elapsed
+def compress_per_frame_zlib_native(data: bytes, frame_size: int, level: int = 6) -> tuple[int, int]:
+    """compress_per_frame_zlib's loop in C (frame_compress.pyx), GIL released.
+
+    Same zlib calls and accounting, so the gap to the zlib_frame rows is the
+    Python per-frame loop overhead.
+    """
+    if not HAS_NATIVE_FRAMES:
+        return 0, 0
+    return bench(lambda: frame_compress.bench_frames(data, frame_size, level))
+
+
+def compress_per_frame_zlib_checksum(data: bytes, frame_size: int, level: int, checksum: Callable[[memoryview], int]) -> tuple[int, int]:
+    """Per-frame zlib with a 4-byte checksum of each frame's plaintext."""
+    mv = memoryview(data)
+
+    def run() -> int:
+        total = 0
+        offset = 0
+        while offset < len(mv):
+            chunk = mv[offset:offset + frame_size]
+            compressed = zlib.compress(chunk, level)
+            checksum(chunk)
+            total += 4 + 4 + len(compressed)  # length prefix + checksum
+            offset += frame_size
+        return total
+
+    return bench(run)
+
+
+# rtach's send path (src/compression.zig compressOrPassthrough): raw deflate
+# at level 6, payloads under 64 bytes skip compression, and output that
+# isn't smaller is sent as-is. Server->client packets carry [type:1][len:4].
+RTACH_MIN_COMPRESS = 64
+RTACH_HEADER = 5
+
+
+def compress_per_frame_rtach(data: bytes, frame_size: int) -> tuple[int, int]:
+    """Per-frame compression exactly as the rtach server sends it."""
+    mv = memoryview(data)
+
+    def run() -> int:
+        total = 0
+        offset = 0
+        while offset < len(mv):
+            chunk = mv[offset:offset + frame_size]
+            sent = len(chunk)
+            if sent >= RTACH_MIN_COMPRESS:
+                # wbits=-15: raw deflate, same as deflateInit2(..., -15, 8, ...)
+                cobj = zlib.compressobj(6, zlib.DEFLATED, -15, 8, zlib.Z_DEFAULT_STRATEGY)
+                sent = min(sent, len(cobj.compress(chunk)) + len(cobj.flush()))
+            total += RTACH_HEADER + sent
+            offset += frame_size
+        return total
+
+    return bench(run)
 
 
 def compress_streaming_lzma(data: bytes) -> tuple[int, int]:
     """LZMA streaming compression."""
-    start = time.perf_counter_ns()
-    compressed = lzma.compress(data)
-    elapsed = time.perf_counter_ns() - start
-    return len(compressed), elapsed
+    return bench(lambda: len(lzma.compress(data)))
 
 
-def compress_streaming_zstd(data: bytes, level: int = 3) -> tuple[int, int]:
-    """Zstd streaming compression."""
+def compress_streaming_zstd(data: bytes, cctx: "zstd.ZstdCompressor") -> tuple[int, int]:
+    """Zstd streaming compression with a caller-owned (reused) context."""
     if not HAS_ZSTD:
         return 0, 0
-    start = time.perf_counter_ns()
-    cctx = zstd.ZstdCompressor(level=level)
-    compressed = cctx.compress(data)
-    elapsed = time.perf_counter_ns() - start
-    return len(compressed), elapsed
+    return bench(lambda: len(cctx.compress(data)))
 
 
-def compress_per_frame_zstd(data: bytes, frame_size: int, level: int = 3) -> tuple[int, int]:
-    """Zstd per-frame compression."""
+def compress_per_frame_zstd(data: bytes, frame_size: int, cctx: "zstd.ZstdCompressor") -> tuple[int, int]:
+    """Zstd per-frame compression; each frame is independent, the context is reused."""
     if not HAS_ZSTD:
         return 0, 0
-    start = time.perf_counter_ns()
-    cctx = zstd.ZstdCompressor(level=level)
-    total = 0
-    offset = 0
+    mv = memoryview(data)  # frame slices are zero-copy views
 
-    while offset < len(data):
-        chunk = data[offset:offset + frame_size]
-        compressed = cctx.compress(chunk)
-        total += 4 + len(compressed)
-        offset += frame_size
+    def run() -> int:
+        total = 0
+        offset = 0
+        while offset < len(mv):
+            chunk = mv[offset:offset + frame_size]
+            compressed = cctx.compress(chunk)
+            total += 4 + len(compressed)
+            offset += frame_size
+        return total
 
-    elapsed = time.perf_counter_ns() - start
-    return total, elapsed
+    return bench(run)
 
 
-def main():
-    print("=" * 80)
-    print("RTACH COMPRESSION BENCHMARK")
-    print("=" * 80)
+def compress_streaming_lz4(data: bytes, level: int = 0) -> tuple[int, int]:
+    """LZ4 frame-format streaming compression (level 0 = fast mode)."""
+    if not HAS_LZ4:
+        return 0, 0
+    return bench(lambda: len(lz4.frame.compress(data, compression_level=level)))
 
-    test_sizes = [1024, 4096, 16384, 65536]
-    frame_sizes = [256, 512, 1024, 2048, 4096]
 
-    for size in test_sizes:
-        print(f"\n{'='*80}")
-        print(f"Data size: {size} bytes")
-        print("=" * 80)
+def compress_per_frame_lz4(data: bytes, frame_size: int, mode: str = "default") -> tuple[int, int]:
+    """LZ4 block per-frame compression; no frame header, just the block.
 
-        terminal_data = generate_terminal_data(size)
-        editor_data = generate_editor_data(size)
+    lz4.block keeps its 4-byte uncompressed-size prefix, since a receiver
+    needs it to size the output buffer.
+    """
+    if not HAS_LZ4:
+        return 0, 0
+    mv = memoryview(data)
 
-        for name, data in [("Terminal (mixed)", terminal_data), ("Editor (cursor)", editor_data)]:
-            print(f"\n{name}:")
-            print(f"{'Strategy':<45} {'Orig':>8} {'Comp':>8} {'Ratio':>8} {'MB/s':>8}")
-            print("-" * 80)
+    def run() -> int:
+        total = 0
+        offset = 0
+        while offset < len(mv):
+            chunk = mv[offset:offset + frame_size]
+            compressed = lz4.block.compress(chunk, mode=mode)
+            total += 4 + len(compressed)
+            offset += frame_size
+        return total
+
+    return bench(run)
+
+
+def compress_streaming_brotli(data: bytes, quality: int = 4) -> tuple[int, int]:
+    """Brotli streaming compression."""
+    if not HAS_BROTLI:
+        return 0, 0
+    return bench(lambda: len(brotli.compress(data, quality=quality)))
+
+
+def compress_per_frame_brotli(data: bytes, frame_size: int, quality: int = 4) -> tuple[int, int]:
+    """Brotli per-frame compression; its built-in static dictionary helps short frames."""
+    if not HAS_BROTLI:
+        return 0, 0
+    mv = memoryview(data)
+
+    def run() -> int:
+        total = 0
+        offset = 0
+        while offset < len(mv):
+            chunk = mv[offset:offset + frame_size]
+            compressed = brotli.compress(chunk, quality=quality)
+            total += 4 + len(compressed)
+            offset += frame_size
+        return total
+
+    return bench(run)
+
+
+_thread_state = threading.local()
+
+
+def _thread_zstd_cctx(level: int) -> "zstd.ZstdCompressor":
+    """Per-thread ZstdCompressor; a single context isn't safe to share."""
+    cache = getattr(_thread_state, "zstd_cctx", None)
+    if cache is None:
+        cache = _thread_state.zstd_cctx = {}
+    if level not in cache:
+        cache[level] = zstd.ZstdCompressor(level=level)
+    return cache[level]
+
+
+def compress_per_frame_zstd_parallel(data: bytes, frame_size: int, level: int, pool: Executor, workers: int) -> tuple[int, int]:
+    """Zstd per-frame compression spread across a thread pool.
+
+    zstd releases the GIL while compressing, so independent frames scale
+    with cores. Frames are handed out in one contiguous run per worker to
+    keep dispatch overhead out of the measurement.
+    """
+    if not HAS_ZSTD:
+        return 0, 0
+    mv = memoryview(data)
+    frames = [mv[offset:offset + frame_size] for offset in range(0, len(mv), frame_size)]
+    per_worker = -(-len(frames) // workers)
+    runs = [frames[i:i + per_worker] for i in range(0, len(frames), per_worker)]
+
+    def compress_run(run: list[memoryview]) -> int:
+        cctx = _thread_zstd_cctx(level)
+        return sum(4 + len(cctx.compress(frame)) for frame in run)
+
+    return bench(lambda: sum(pool.map(compress_run, runs)))
+
+
+def train_zstd_dictionary(frame_size: int, samples: int = 100, dict_size: int = 16 * 1024) -> "zstd.ZstdCompressionDict":
+    """Train a zstd dictionary on terminal-data frames.
+
+    The corpus comes from a different seed than the benchmark data so the
+    dictionary isn't scored on the exact bytes it was trained on.
+    """
+    corpus = generate_terminal_data(frame_size * samples, seed=54321)
+    frames = [corpus[i:i + frame_size] for i in range(0, len(corpus), frame_size)]
+    return zstd.train_dictionary(dict_size, frames)
+
+
+DATASETS: dict[str, Callable[[int], bytes]] = {
+    "Terminal (mixed)": generate_terminal_data,
+    "Editor (cursor)": generate_editor_data,
+}
+
+THREADS = os.cpu_count() or 1
+
+
+@dataclass(frozen=True)
+class Job:
+    """One cell of the benchmark grid."""
+    dataset: str
+    size: int
+    name: str
+    strategy: str
+    frame: int = 0
+    level: int = 0
+    checksum: str = ""
+
+
+# Workers rebuild payloads and compression contexts locally from these
+# caches, so a Job only carries parameters across the process boundary.
+# Contexts are created once and reused, as a long-lived rtach session
+# would; only the compress calls are timed.
+@functools.lru_cache(maxsize=None)
+def _payload(dataset: str, size: int) -> bytes:
+    return DATASETS[dataset](size)
+
+
+@functools.lru_cache(maxsize=None)
+def _zstd_cctx(level: int) -> "zstd.ZstdCompressor":
+    return zstd.ZstdCompressor(level=level)
+
+
+@functools.lru_cache(maxsize=None)
+def _zstd_dict(frame: int) -> "zstd.ZstdCompressionDict":
+    return train_zstd_dictionary(frame)
+
+
+@functools.lru_cache(maxsize=None)
+def _zstd_dict_cctx(frame: int, level: int) -> "zstd.ZstdCompressor":
+    return zstd.ZstdCompressor(level=level, dict_data=_zstd_dict(frame))
+
+
+@functools.lru_cache(maxsize=None)
+def _thread_pool() -> ThreadPoolExecutor:
+    pool = ThreadPoolExecutor(max_workers=THREADS)
+    # Warm the pool so thread startup isn't charged to the first measurement
+    list(pool.map(_thread_zstd_cctx, [3] * THREADS))
+    return pool
+
+
+STRATEGIES: dict[str, Callable[[bytes, Job], tuple[int, int]]] = {
+    "zlib_streaming": lambda data, job: compress_streaming_zlib(data, job.level),
+    "zlib_frame": lambda data, job: compress_per_frame_zlib(data, job.frame, job.level),
+    "zlib_frame_native": lambda data, job: compress_per_frame_zlib_native(data, job.frame, job.level),
+    "zlib_frame_checksum": lambda data, job: compress_per_frame_zlib_checksum(data, job.frame, job.level, CHECKSUMS[job.checksum]),
+    "rtach_frame": lambda data, job: compress_per_frame_rtach(data, job.frame),
+    "lzma_streaming": lambda data, job: compress_streaming_lzma(data),
+    "zstd_streaming": lambda data, job: compress_streaming_zstd(data, _zstd_cctx(job.level)),
+    "zstd_frame": lambda data, job: compress_per_frame_zstd(data, job.frame, _zstd_cctx(job.level)),
+    "zstd_frame_dict": lambda data, job: compress_per_frame_zstd(data, job.frame, _zstd_dict_cctx(job.frame, job.level)),
+    "zstd_frame_threads": lambda data, job: compress_per_frame_zstd_parallel(data, job.frame, job.level, _thread_pool(), THREADS),
+    "lz4_streaming": lambda data, job: compress_streaming_lz4(data, job.level),
+    "lz4_frame": lambda data, job: compress_per_frame_lz4(data, job.frame),
+    "lz4_frame_hc": lambda data, job: compress_per_frame_lz4(data, job.frame, "high_compression"),
+    "brotli_streaming": lambda data, job: compress_streaming_brotli(data, job.level),
+    "brotli_frame": lambda data, job: compress_per_frame_brotli(data, job.frame, job.level),
+}
+
+# Strategies that use every core themselves; they run in the parent
+# process after the process pool has drained.
+EXCLUSIVE = {"zstd_frame_threads"}
+
+
+def build_jobs(test_sizes: list[int], slow: bool = False) -> list[Job]:
+    """The benchmark grid, in report order.
+
+    LZMA and level 9 are only included with slow=True: the analysis already
+    rules them out for real-time use, and they dominate the runtime.
+    """
+    jobs = []
+    for size in test_sizes:
+        for dataset in DATASETS:
+            def add(name: str, strategy: str, **params) -> None:
+                jobs.append(Job(dataset, size, name, strategy, **params))
 
             # Streaming zlib
-            for level in [1, 6, 9]:
-                comp, ns = compress_streaming_zlib(data, level)
-                ratio = comp / size * 100
-                mbps = (size / 1024 / 1024) / (ns / 1e9) if ns > 0 else 0
-                print(f"zlib_streaming_level{level:<25} {size:>8} {comp:>8} {ratio:>7.1f}% {mbps:>7.1f}")
+            for level in [1, 6, 9] if slow else [1, 6]:
+                add(f"zlib_streaming_level{level}", "zlib_streaming", level=level)
 
             # Per-frame zlib
             for frame in [512, 1024, 2048]:
                 if frame > size:
                     continue
                 for level in [1, 6]:
-                    comp, ns = compress_per_frame_zlib(data, frame, level)
-                    ratio = comp / size * 100
-                    mbps = (size / 1024 / 1024) / (ns / 1e9) if ns > 0 else 0
-                    print(f"zlib_frame{frame}_level{level:<22} {size:>8} {comp:>8} {ratio:>7.1f}% {mbps:>7.1f}")
+                    add(f"zlib_frame{frame}_level{level}", "zlib_frame", frame=frame, level=level)
+                    if HAS_NATIVE_FRAMES:
+                        add(f"zlib_frame{frame}_level{level}_native", "zlib_frame_native", frame=frame, level=level)
+
+                # Same frames with an integrity checksum appended
+                for checksum in CHECKSUMS:
+                    add(f"zlib_frame{frame}_level6_{checksum}", "zlib_frame_checksum", frame=frame, level=6, checksum=checksum)
+
+                # What rtach actually sends for these frames
+                add(f"rtach_frame{frame}", "rtach_frame", frame=frame)
 
             # Streaming LZMA (slow but best ratio)
-            if size <= 16384:  # Skip for large sizes, too slow
-                comp, ns = compress_streaming_lzma(data)
-                ratio = comp / size * 100
-                mbps = (size / 1024 / 1024) / (ns / 1e9) if ns > 0 else 0
-                print(f"lzma_streaming{'':<31} {size:>8} {comp:>8} {ratio:>7.1f}% {mbps:>7.1f}")
+            if slow and size <= 16384:  # Skip for large sizes, too slow
+                add("lzma_streaming", "lzma_streaming")
 
             # Zstd if available
             if HAS_ZSTD:
-                for level in [1, 3, 9]:
-                    comp, ns = compress_streaming_zstd(data, level)
-                    ratio = comp / size * 100
-                    mbps = (size / 1024 / 1024) / (ns / 1e9) if ns > 0 else 0
-                    print(f"zstd_streaming_level{level:<25} {size:>8} {comp:>8} {ratio:>7.1f}% {mbps:>7.1f}")
+                for level in [1, 3, 9] if slow else [1, 3]:
+                    add(f"zstd_streaming_level{level}", "zstd_streaming", level=level)
 
                 for frame in [1024, 2048]:
                     if frame > size:
                         continue
-                    comp, ns = compress_per_frame_zstd(data, frame, 3)
-                    ratio = comp / size * 100
-                    mbps = (size / 1024 / 1024) / (ns / 1e9) if ns > 0 else 0
-                    print(f"zstd_frame{frame}_level3{'':<21} {size:>8} {comp:>8} {ratio:>7.1f}% {mbps:>7.1f}")
+                    add(f"zstd_frame{frame}_level3", "zstd_frame", frame=frame, level=3)
+                    add(f"zstd_frame{frame}_level3_dict", "zstd_frame_dict", frame=frame, level=3)
+                    add(f"zstd_frame{frame}_level3_{THREADS}threads", "zstd_frame_threads", frame=frame, level=3)
+
+            # LZ4: fastest of the bunch, lower ratio
+            if HAS_LZ4:
+                add("lz4_streaming", "lz4_streaming")
+                for frame in [1024, 2048]:
+                    if frame > size:
+                        continue
+                    add(f"lz4_frame{frame}", "lz4_frame", frame=frame)
+                    add(f"lz4_frame{frame}_hc", "lz4_frame_hc", frame=frame)
+
+            # Brotli: static dictionary favors short text frames
+            if HAS_BROTLI:
+                add("brotli_streaming_q4", "brotli_streaming", level=4)
+                for frame in [1024, 2048]:
+                    if frame > size:
+                        continue
+                    add(f"brotli_frame{frame}_q4", "brotli_frame", frame=frame, level=4)
+    return jobs
+
+
+def run_one(job: Job) -> Result:
+    """Run a single grid cell; safe to call in a worker process."""
+    data = _payload(job.dataset, job.size)
+    comp, ns = STRATEGIES[job.strategy](data, job)
+    return Result(job.name, job.size, comp, ns, dataset=job.dataset)
+
+
+def run_jobs(jobs: list[Job], workers: int) -> list[Result]:
+    """Run the grid across processes, keeping results in job order."""
+    results: list[Optional[Result]] = [None] * len(jobs)
+    shared = [i for i, job in enumerate(jobs) if job.strategy not in EXCLUSIVE]
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            for i, result in zip(shared, ex.map(run_one, [jobs[i] for i in shared])):
+                results[i] = result
+    else:
+        for i in shared:
+            results[i] = run_one(jobs[i])
+
+    for i, job in enumerate(jobs):
+        if results[i] is None:
+            results[i] = run_one(job)
+    return results
+
+
+def print_table(table: np.ndarray) -> None:
+    """Human-readable report, grouped by payload size and dataset."""
+    size = dataset = None
+    for r in table:
+        if r["size"] != size:
+            size, dataset = r["size"], None
+            print(f"\n{'='*80}")
+            print(f"Data size: {size} bytes")
+            print("=" * 80)
+        if r["dataset"] != dataset:
+            dataset = r["dataset"]
+            print(f"\n{dataset}:")
+            print(f"{'Strategy':<45} {'Orig':>8} {'Comp':>8} {'Ratio':>8} {'MB/s':>8}")
+            print("-" * 80)
+        print(f"{r['name']:<45} {r['size']:>8} {r['compressed']:>8} {r['ratio']:>7.1f}% {r['mbps']:>7.1f}")
+
+
+def write_csv(table: np.ndarray) -> None:
+    """One row per grid cell on stdout, for regression tracking."""
+    writer = csv.writer(sys.stdout)
+    writer.writerow(["dataset", "size", "strategy", "compressed", "time_ns", "ratio", "mbps"])
+    writer.writerows(
+        (dataset, size, name, comp, ns, f"{ratio:.2f}", f"{mbps:.2f}")
+        for dataset, name, size, comp, ns, ratio, mbps in table.tolist()
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compression benchmark for rtach terminal data")
+    parser.add_argument("--csv", action="store_true", help="Emit results as CSV instead of a table")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="Worker processes (default: 1); >1 is faster but MB/s figures are contended")
+    parser.add_argument("--slow", action="store_true", help="Include LZMA and level-9 configurations")
+    args = parser.parse_args()
+
+    if not HAS_ZSTD:
+        print("Note: zstd not available, skipping zstd tests", file=sys.stderr)
+        print("Run with: uv run --with zstandard tools/compression_bench.py\n", file=sys.stderr)
+    if not HAS_LZ4 or not HAS_BROTLI:
+        print("Note: lz4/brotli comparisons need: uv run --with lz4 --with brotli tools/compression_bench.py\n", file=sys.stderr)
+    if not HAS_NATIVE_FRAMES:
+        print("Note: native per-frame rows need Cython and a C compiler: "
+              "uv run --with cython --with setuptools tools/compression_bench.py\n", file=sys.stderr)
+
+    test_sizes = [1024, 4096, 16384, 65536]
+    table = tabulate(run_jobs(build_jobs(test_sizes, slow=args.slow), args.jobs))
+
+    # Kept out of CSV rows so the file stays machine-readable
+    contended = (f"Warning: --jobs {args.jobs} ran cells concurrently; MB/s figures are "
+                 "contended and not comparable to a serial run")
+
+    if args.csv:
+        if args.jobs > 1:
+            print(contended, file=sys.stderr)
+        write_csv(table)
+        return
+
+    print("=" * 80)
+    print("RTACH COMPRESSION BENCHMARK")
+    print("=" * 80)
+
+    # Trained dictionaries give stateless frames shared history to match
+    # against. The dictionary ships out of band, so its size is reported
+    # here rather than added to each frame.
+    if HAS_ZSTD:
+        for frame in [1024, 2048]:
+            print(f"zstd dictionary for {frame}-byte frames: {len(_zstd_dict(frame))} bytes")
+
+    if not args.slow:
+        print("Skipped LZMA and level-9 configurations (pass --slow to include them)")
+    if args.jobs > 1:
+        print(contended)
+
+    print_table(table)
 
     print("\n" + "=" * 80)
     print("ANALYSIS & RECOMMENDATIONS")
@@ -254,11 +738,18 @@ KEY FINDINGS:
    - zlib: Best balance of speed/ratio, available everywhere
    - zstd: Better ratio at same speed, requires extra dependency
    - lzma: Best ratio but far too slow for real-time
+   - lz4: ~10x zlib's speed, but per-frame ratio is noticeably worse
+   - brotli: Per-frame ratio close to zlib (better on editor output), no faster
 
 2. STREAMING vs PER-FRAME:
    - Streaming: ~5-15% better compression ratio
    - Per-frame: Independent decoding, simpler reconnection
    - For rtach: Per-frame is more practical (can decompress partial data)
+   - Per-frame cost is zlib's per-call setup, not Python: the C loop in the
+     *_native rows (when built) is only ~5-10% faster than the Python loop
+   - A trained zstd dictionary recovers most of the streaming ratio for
+     per-frame mode on output resembling its training corpus, but hurts on
+     unrelated output (see Editor rows) and must be shipped to clients
 
 3. OPTIMAL FRAME SIZE:
    - 256 bytes: Too much overhead from frame headers
@@ -286,6 +777,9 @@ PROTOCOL CHANGE:
     bit 0: compressed (1) or raw (0)
     bit 1-7: reserved
 
+  A per-frame CRC costs 4 bytes per frame; compare the *_crc32/*_crc32c
+  rows against plain zlib_frame*_level6 for its throughput cost.
+
 MOSH COMPARISON:
   - Mosh uses zlib with 4MB dictionary (stateful streaming)
   - Mosh compresses terminal STATE DIFFS, not raw output
@@ -0,0 +1,63 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Native per-frame zlib driver for compression_bench.py.
+
+Runs the same split/compress/sum loop as compress_per_frame_zlib, but in C
+without the GIL, so comparing the two rows shows how much of the per-frame
+cost is Python loop overhead rather than zlib itself.
+
+Built on first import via pyximport (needs Cython, setuptools on Python
+3.12+, a C compiler and zlib headers; frame_compress.pyxbld links libz); the
+benchmark skips the native rows if that fails.
+"""
+
+from libc.stdlib cimport malloc, free
+
+cdef extern from "zlib.h" nogil:
+    ctypedef unsigned long uLong
+    ctypedef unsigned long uLongf
+    ctypedef unsigned char Bytef
+    int Z_OK
+    uLong compressBound(uLong sourceLen)
+    int compress2(Bytef *dest, uLongf *destLen, const Bytef *source, uLong sourceLen, int level)
+
+
+def bench_frames(const unsigned char[::1] data, Py_ssize_t frame_size, int level):
+    """Compress data in independent frame_size frames; return total bytes.
+
+    Accounting matches compress_per_frame_zlib: zlib format (compress2, as
+    zlib.compress uses) plus a 4-byte length prefix per frame.
+    """
+    cdef Py_ssize_t n = data.shape[0]
+    cdef Py_ssize_t offset = 0
+    cdef Py_ssize_t chunk
+    cdef Py_ssize_t total = 0
+    cdef uLongf out_len
+    cdef uLong bound = compressBound(<uLong>frame_size)
+    cdef int rc = Z_OK
+    cdef Bytef *out
+
+    if frame_size <= 0:
+        raise ValueError("frame_size must be positive")
+    if n == 0:
+        return 0
+
+    out = <Bytef *>malloc(bound)
+    if out == NULL:
+        raise MemoryError()
+    try:
+        with nogil:
+            while offset < n:
+                chunk = min(frame_size, n - offset)
+                out_len = bound
+                rc = compress2(out, &out_len, &data[offset], <uLong>chunk, level)
+                if rc != Z_OK:
+                    break
+                total += 4 + <Py_ssize_t>out_len
+                offset += frame_size
+    finally:
+        free(out)
+
+    if rc != Z_OK:
+        raise RuntimeError(f"compress2 failed: {rc}")
+    return total